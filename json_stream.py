@@ -0,0 +1,198 @@
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Parser states reported by IncrementalJSONParser.feed
+INCOMPLETE = "incomplete"
+COMPLETE = "complete"
+MALFORMED = "malformed"
+
+Validator = Callable[[Any], bool]
+# Field name -> (coercion raising ValueError/TypeError on bad input, default value)
+Schema = Dict[str, Tuple[Callable[[Any], Any], Any]]
+
+_CLOSERS = {"}": "{", "]": "["}
+
+
+class IncrementalJSONParser:
+    """Incrementally scan a streamed JSON object, validating top-level fields as they complete"""
+
+    def __init__(self, validators: Optional[Dict[str, Validator]] = None):
+        self.validators = validators or {}
+        self.buffer = []
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.state = INCOMPLETE
+        self.value = None
+        self.partial = {}  # Top-level members decoded so far, including invalid ones
+        self.invalid_fields = set()  # Members that failed validation, left for schema repair
+        self.array_end = None  # Buffer length after the last complete element of a top-level member's array
+
+    def feed(self, chunk: str) -> str:
+        """Consume the next chunk of model output and return the parser state"""
+        for char in chunk:
+            if self.state != INCOMPLETE:
+                break
+            self._consume(char)
+        return self.state
+
+    def _consume(self, char: str):
+        if not self.stack:
+            if char.isspace():
+                return
+            if char != "{":
+                # JSON mode must produce a single object; anything else is wasted tokens
+                self.state = MALFORMED
+                return
+
+        self.buffer.append(char)
+        if self.in_string:
+            if self.escaped:
+                self.escaped = False
+            elif char == "\\":
+                self.escaped = True
+            elif char == '"':
+                self.in_string = False
+            return
+
+        if char == '"':
+            self.in_string = True
+        elif char in "{[":
+            self.stack.append(char)
+        elif char in _CLOSERS:
+            if self.stack.pop() != _CLOSERS[char]:
+                self.state = MALFORMED
+            elif not self.stack:
+                self._finish()
+        elif char == "," and len(self.stack) == 1:
+            # A top-level member just completed, so the prefix closes into a valid object
+            self.array_end = None
+            self._check_members("".join(self.buffer[:-1]) + "}")
+        elif char == "," and self.stack == ["{", "["]:
+            self.array_end = len(self.buffer) - 1
+
+    def _check_members(self, text: str):
+        try:
+            members = json.loads(text)
+        except json.JSONDecodeError:
+            self.state = MALFORMED
+            return
+        for key, value in members.items():
+            if key in self.partial:
+                continue
+            validator = self.validators.get(key)
+            if validator and not validator(value):
+                self.invalid_fields.add(key)
+            self.partial[key] = value
+        if self.invalid_fields:
+            # Keep what was decoded so repair can default the invalid fields
+            self.state = MALFORMED
+
+    def close(self) -> Dict:
+        """Recover the top-level members of an object the stream ended before closing"""
+        if self.state != INCOMPLETE or not self.stack:
+            return self.partial
+
+        candidates = []
+        if not self.in_string:
+            # The last member may be complete even though its closing brackets never came
+            closers = "".join("}" if opener == "{" else "]" for opener in reversed(self.stack))
+            candidates.append("".join(self.buffer).rstrip().rstrip(",") + closers)
+        if self.array_end is not None:
+            # Otherwise keep a member's array up to its last complete element
+            candidates.append("".join(self.buffer[:self.array_end]) + "]}")
+        for text in candidates:
+            try:
+                json.loads(text)
+            except json.JSONDecodeError:
+                continue
+            self._check_members(text)
+            break
+        return self.partial
+
+    def _finish(self):
+        self._check_members("".join(self.buffer))
+        if self.state == INCOMPLETE:
+            self.value = self.partial
+            self.state = COMPLETE
+
+
+def decode_json_fragment(text: str) -> Optional[Dict]:
+    """Decode the JSON object starting at the first '{' in free text
+
+    Nested values are never returned on their own: if the outermost object is
+    truncated or invalid, there is no top-level result.
+    """
+    start = (text or "").find("{")
+    if start == -1:
+        return None
+    try:
+        value = json.JSONDecoder().raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def repair_object(data: Any, schema: Schema) -> Dict:
+    """Coerce an object onto a schema, replacing missing or invalid fields with defaults"""
+    data = data if isinstance(data, dict) else {}
+    repaired = dict(data)
+    for field, (coerce, default) in schema.items():
+        try:
+            repaired[field] = coerce(data[field])
+        except (KeyError, ValueError, TypeError):
+            repaired[field] = default
+    return repaired
+
+
+def as_score(value: Any) -> float:
+    """Coerce a score onto the 1.0-4.0 scale"""
+    return max(1.0, min(float(value), 4.0))
+
+
+def as_text_list(value: Any) -> list:
+    """Coerce a value to a list of strings"""
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list):
+        raise TypeError("expected a list")
+    return [str(item) for item in value]
+
+
+def as_list(value: Any) -> list:
+    """Require a value to be a list"""
+    if not isinstance(value, list):
+        raise TypeError("expected a list")
+    return value
+
+
+def as_dict(value: Any) -> dict:
+    """Require a value to be an object"""
+    if not isinstance(value, dict):
+        raise TypeError("expected an object")
+    return value
+
+
+def as_object(schema: Schema) -> Callable[[Any], Dict]:
+    """Build a coercion that repairs a nested object against its schema"""
+    def coerce(value: Any) -> Dict:
+        return repair_object(as_dict(value), schema)
+    return coerce
+
+
+def as_text(value: Any) -> str:
+    """Coerce a scalar value to a string"""
+    if isinstance(value, (dict, list)):
+        raise TypeError("expected text")
+    return str(value)
+
+
+def is_coercible(coerce: Callable[[Any], Any]) -> Validator:
+    """Build a streaming validator that accepts values the schema can repair"""
+    def validator(value: Any) -> bool:
+        try:
+            coerce(value)
+            return True
+        except (ValueError, TypeError):
+            return False
+    return validator
@@ -0,0 +1,133 @@
+from collections import Counter
+from typing import Dict, List
+
+# Substring markers whose presence signals each quality aspect of a response
+QUALITY_MARKERS = {
+    "has_examples": ["example", "instance", "case", "situation"],
+    "has_metrics": ["measure", "metric", "kpi", "indicator", "target"],
+    "has_implementation": ["implement", "execute", "deploy", "roll out"],
+    "has_challenges": ["challenge", "difficulty", "problem", "issue"]
+}
+
+INAPPROPRIATE_MARKERS = ["ur mom", "bleh", "idk", "whatever"]
+
+VAGUE_WORDS = ["maybe", "probably", "might", "could", "would"]
+
+MIN_RESPONSE_WORDS = 50
+MAX_VAGUE_WORDS = 2
+
+
+def _count_from(text: str, marker: str, start: int) -> int:
+    """Count (possibly overlapping) occurrences of marker starting at or after start"""
+    count = 0
+    index = text.find(marker, start)
+    while index != -1:
+        count += 1
+        index = text.find(marker, index + 1)
+    return count
+
+
+class LiveResponseAnalysis:
+    """Running response analysis updated in O(delta) as text is appended or deleted"""
+
+    def __init__(self):
+        self._raw: List[str] = []
+        self._lower: List[str] = []
+        self._word_start = None  # Index where the word being typed starts, if any
+        self.word_count = 0
+        self.vague_counts = Counter()  # Completed words that are vague
+        self.markers = sorted({m for group in QUALITY_MARKERS.values() for m in group} | set(INAPPROPRIATE_MARKERS))
+        self.marker_counts = Counter()
+        self._tail_length = max(len(m) for m in self.markers)
+
+    @classmethod
+    def from_text(cls, text: str) -> "LiveResponseAnalysis":
+        """Analyse a complete response in one pass"""
+        state = cls()
+        state.append(text)
+        return state
+
+    @property
+    def text(self) -> str:
+        return "".join(self._raw)
+
+    def tail_text(self, length: int) -> str:
+        """Last characters of the response, without joining the whole text"""
+        return "".join(self._raw[-length:]) if length > 0 else ""
+
+    def _tail(self, length: int) -> str:
+        return "".join(self._lower[-length:]) if length > 0 else ""
+
+    def append(self, chunk: str):
+        """Extend the response, scanning only the new text plus a marker-length overlap"""
+        if not chunk:
+            return
+        tail = self._tail(self._tail_length - 1)
+        lowered = [char.lower() for char in chunk]
+        window = tail + "".join(lowered)
+        for marker in self.markers:
+            # Only count occurrences that end inside the new chunk
+            found = _count_from(window, marker, max(0, len(tail) - len(marker) + 1))
+            if found:
+                self.marker_counts[marker] += found
+
+        for char, lower in zip(chunk, lowered):
+            if char.isspace():
+                if self._word_start is not None:
+                    self._commit_word(self._current_word())
+                    self._word_start = None
+            elif self._word_start is None:
+                self._word_start = len(self._lower)
+                self.word_count += 1
+            self._raw.append(char)
+            self._lower.append(lower)
+
+    def backspace(self, count: int = 1):
+        """Remove the last characters, undoing their contribution to the counts"""
+        for _ in range(min(count, len(self._raw))):
+            tail = self._tail(self._tail_length)
+            for marker in self.markers:
+                if tail.endswith(marker):
+                    self.marker_counts[marker] -= 1
+
+            char = self._raw.pop()
+            self._lower.pop()
+            if not char.isspace():
+                if self._word_start == len(self._lower):
+                    self._word_start = None
+                    self.word_count -= 1
+            elif self._lower and not self._raw[-1].isspace():
+                # Deleting the separator makes the previous word editable again
+                start = len(self._raw) - 1
+                while start > 0 and not self._raw[start - 1].isspace():
+                    start -= 1
+                self._word_start = start
+                self._commit_word(self._current_word(), -1)
+
+    def _current_word(self) -> str:
+        return "".join(self._lower[self._word_start:]) if self._word_start is not None else ""
+
+    def _commit_word(self, word: str, delta: int = 1):
+        if word in VAGUE_WORDS:
+            self.vague_counts[word] += delta
+
+    def _has_any(self, markers: List[str]) -> bool:
+        return any(self.marker_counts[m] > 0 for m in markers)
+
+    @property
+    def vague_words(self) -> int:
+        """Number of distinct vague words used, including the word being typed"""
+        current = self._current_word()
+        return sum(1 for word in VAGUE_WORDS if self.vague_counts[word] > 0 or word == current)
+
+    @property
+    def is_inappropriate(self) -> bool:
+        return self._has_any(INAPPROPRIATE_MARKERS)
+
+    def snapshot(self) -> Dict:
+        """Current quality analysis in the shape used by LLMHandler"""
+        analysis = {"length": self.word_count}
+        for flag, markers in QUALITY_MARKERS.items():
+            analysis[flag] = self._has_any(markers)
+        analysis["vague_words"] = self.vague_words
+        return analysis
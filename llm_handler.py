@@ -2,6 +2,46 @@ import json
 import requests
 from typing import Dict, List, Tuple, Optional
 import random
+from json_stream import (COMPLETE, INCOMPLETE, IncrementalJSONParser, as_dict, as_list, as_object,
+                         as_score, as_text, as_text_list, decode_json_fragment, is_coercible,
+                         repair_object)
+from live_analysis import MAX_VAGUE_WORDS, MIN_RESPONSE_WORDS, LiveResponseAnalysis
+from profiling import profile_span
+from themes import DEFAULT_THEMES, DOMINANT_THEME_SCORE, ThemeEngine
+
+EVALUATION_SYSTEM_PROMPT = """You are evaluating role-play responses.
+        Focus on demonstrated competencies and practical approaches.
+        Maintain confidentiality in feedback."""
+
+SCORING_GUIDE = """Scoring Guide:
+1.0 - Basic response lacking specifics
+2.0 - General understanding with some examples
+3.0 - Strong response with clear implementation
+4.0 - Exceptional detail and practical insight"""
+
+# Expected shape of a single evaluation result, used to validate and repair model output
+EVALUATION_SCHEMA = {
+    "score": (as_score, 1.0),
+    "strengths": (as_text_list, []),
+    "areas_for_improvement": (as_text_list, []),
+    "feedback": (as_text, "")
+}
+
+OVERALL_ASSESSMENT_SCHEMA = {
+    "score": (as_score, 1.0),
+    "strengths": (as_text_list, []),
+    "development_areas": (as_text_list, []),
+    "recommendations": (as_text_list, [])
+}
+
+FINAL_FEEDBACK_SCHEMA = {
+    "metrics": (as_dict, {}),
+    "overall_assessment": (as_object(OVERALL_ASSESSMENT_SCHEMA), None)
+}
+
+BATCH_EVALUATION_SCHEMA = {
+    "results": (as_list, [])
+}
 
 class LLMHandler:
     def __init__(self, case_doc: Dict, metrics: Dict):
@@ -14,7 +54,13 @@ class LLMHandler:
         self.asked_topics = set()
         self.current_focus = None
         self.probing_count = 0
+        self.theme_engine = ThemeEngine(DEFAULT_THEMES, case_doc)
+        self.context_window = 2048  # TinyLlama's default context size in tokens
+        self.max_batch_size = 5  # Most answers packed into one evaluation prompt
+        self.answer_prompt_tokens = 60  # Per-answer label and analysis overhead
+        self.result_tokens = 120  # Room reserved for each answer's JSON result
         
+    @profile_span("llm.call_ollama")
     def _call_ollama(self, prompt: str, system_prompt: str = "") -> str:
         """Make a call to Ollama API with optional system prompt"""
         try:
@@ -23,27 +69,69 @@ class LLMHandler:
                                       'model': 'tinyllama',
                                       'prompt': prompt,
                                       'system': system_prompt,
-                                      'stream': False
+                                      'stream': False,
+                                      'options': {'num_ctx': self.context_window}
                                   })
             return response.json()['response']
         except Exception as e:
             print(f"Error calling Ollama: {str(e)}")
             return ""
 
+    @profile_span("llm.stream_ollama_json")
+    def _stream_ollama_json(self, prompt: str, system_prompt: str,
+                            parser: IncrementalJSONParser) -> str:
+        """Stream a JSON-mode generation into the parser, aborting once it completes or breaks"""
+        chunks = []
+        try:
+            response = requests.post('http://localhost:11434/api/generate',
+                                  json={
+                                      'model': 'tinyllama',
+                                      'prompt': prompt,
+                                      'system': system_prompt,
+                                      'format': 'json',
+                                      'stream': True,
+                                      'options': {'num_ctx': self.context_window}
+                                  },
+                                  stream=True)
+            # Closing the connection early stops Ollama generating further tokens
+            with response:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    message = json.loads(line)
+                    chunk = message.get('response', '')
+                    chunks.append(chunk)
+                    if parser.feed(chunk) != INCOMPLETE or message.get('done'):
+                        break
+        except Exception as e:
+            print(f"Error calling Ollama: {str(e)}")
+        return "".join(chunks)
+
+    def _generate_json(self, prompt: str, system_prompt: str, schema: Dict) -> Optional[Dict]:
+        """Generate a JSON object matching the schema, repairing partial or invalid output"""
+        validators = {field: is_coercible(coerce) for field, (coerce, _) in schema.items()}
+        parser = IncrementalJSONParser(validators)
+        raw = self._stream_ollama_json(prompt, system_prompt, parser)
+        
+        if parser.state == COMPLETE:
+            data = parser.value
+        elif parser.buffer:
+            # The reply started as an object: keep its validated top-level members
+            data = parser.close()
+        else:
+            # The reply did not start with "{", so look for an object inside the chatter
+            data = decode_json_fragment(raw)
+        if not data:
+            return None
+        return repair_object(data, schema)
+
     def _analyze_response_quality(self, response: str) -> Dict[str, any]:
         """Analyze response quality and identify areas needing probing"""
-        words = response.lower().split()
-        
-        analysis = {
-            "length": len(words),
-            "has_examples": any(word in response.lower() for word in ["example", "instance", "case", "situation"]),
-            "has_metrics": any(word in response.lower() for word in ["measure", "metric", "kpi", "indicator", "target"]),
-            "has_implementation": any(word in response.lower() for word in ["implement", "execute", "deploy", "roll out"]),
-            "has_challenges": any(word in response.lower() for word in ["challenge", "difficulty", "problem", "issue"]),
-            "vague_words": sum(1 for word in ["maybe", "probably", "might", "could", "would"] if word in words),
-            "needs_probing": False,
-            "probe_areas": []
-        }
+        return self._analysis_with_probes(LiveResponseAnalysis.from_text(response).snapshot())
+
+    def _analysis_with_probes(self, analysis: Dict) -> Dict[str, any]:
+        """Add probing guidance to a quality analysis"""
+        analysis["probe_areas"] = []
         
         # Identify areas needing probing
         if not analysis["has_examples"]:
@@ -55,24 +143,25 @@ class LLMHandler:
         if not analysis["has_challenges"]:
             analysis["probe_areas"].append("challenges")
             
-        analysis["needs_probing"] = len(analysis["probe_areas"]) > 0 or analysis["vague_words"] > 2
+        analysis["needs_probing"] = len(analysis["probe_areas"]) > 0 or analysis["vague_words"] > MAX_VAGUE_WORDS
         return analysis
 
+    @profile_span("llm.validate_response")
     def validate_response(self, response: str) -> Tuple[bool, Optional[str]]:
         """Validate response and provide specific guidance"""
-        if not response:
+        return self.validate_analysis(LiveResponseAnalysis.from_text(response.strip() if response else ""))
+
+    @profile_span("llm.validate_analysis")
+    def validate_analysis(self, state: LiveResponseAnalysis) -> Tuple[bool, Optional[str]]:
+        """Validate an incrementally built response analysis without rescanning the text"""
+        if state.word_count == 0:
             return False, "Please provide a response to continue with the assessment."
-            
-        response = response.strip()
         
         # Check for inappropriate responses
-        inappropriate = ["ur mom", "bleh", "idk", "whatever"]
-        if any(word in response.lower() for word in inappropriate):
+        if state.is_inappropriate:
             return False, "Please provide a professional and thoughtful response."
         
-        analysis = self._analyze_response_quality(response)
-        
-        if analysis["length"] < 50:
+        if state.word_count < MIN_RESPONSE_WORDS:
             suggestions = [
                 "Share a specific example from your experience managing branches",
                 "Describe how you would measure success in this situation",
@@ -81,11 +170,26 @@ class LLMHandler:
             ]
             return False, f"Your response needs more detail. Consider:\n- {random.choice(suggestions)}"
         
-        if analysis["vague_words"] > 2:
+        if state.vague_words > MAX_VAGUE_WORDS:
             return False, "Try to be more specific and confident. Instead of using words like 'maybe' or 'probably', share concrete approaches and examples."
             
         return True, None
 
+    def live_guidance(self, state: LiveResponseAnalysis) -> str:
+        """Short hint shown while the candidate is still typing"""
+        if state.is_inappropriate:
+            return "Keep it professional"
+        if state.word_count < MIN_RESPONSE_WORDS:
+            return f"{state.word_count}/{MIN_RESPONSE_WORDS} words"
+        if state.vague_words > MAX_VAGUE_WORDS:
+            return "Too many vague words"
+        analysis = state.snapshot()
+        if not analysis["has_examples"]:
+            return "Add an example"
+        if not analysis["has_metrics"]:
+            return "How will you measure it?"
+        return "Ready to submit"
+
     def _get_focused_probe(self, area: str, context: str) -> str:
         """Generate a focused probing question for a specific area"""
         probes = {
@@ -143,33 +247,12 @@ Format: Generate only the question."""
         
         return self._call_ollama(prompt, system_prompt)
 
+    @profile_span("llm.extract_key_themes")
     def _extract_key_themes(self, response: str) -> Dict[str, float]:
         """Extract key themes and their relevance from a response"""
-        themes = {
-            "customer_service": ["customer", "service", "satisfaction", "experience", "feedback"],
-            "operations": ["process", "operation", "workflow", "efficiency", "system"],
-            "team_management": ["team", "staff", "employee", "manager", "training"],
-            "performance": ["performance", "metric", "kpi", "measure", "target"],
-            "communication": ["communicate", "message", "inform", "share", "discuss"],
-            "implementation": ["implement", "execute", "deploy", "roll out", "launch"],
-            "challenges": ["challenge", "issue", "problem", "difficulty", "concern"]
-        }
-        
-        words = response.lower().split()
-        theme_scores = {theme: 0.0 for theme in themes}
-        
-        for word in words:
-            for theme, keywords in themes.items():
-                if any(keyword in word for keyword in keywords):
-                    theme_scores[theme] += 1.0
-                    
-        # Normalize scores
-        max_score = max(theme_scores.values()) if theme_scores.values() else 1.0
-        if max_score > 0:
-            theme_scores = {k: v/max_score for k, v in theme_scores.items()}
-            
-        return theme_scores
+        return self.theme_engine.score_themes(response)
 
+    @profile_span("llm.generate_followup_question")
     def generate_followup_question(self, previous_response: str) -> Tuple[Optional[str], Optional[str]]:
         """Generate contextual follow-up questions"""
         if not self.current_metric or self.question_count >= self.questions_per_metric:
@@ -199,12 +282,10 @@ Format: Generate only the question."""
         
         # Extract themes and key topics from the response
         theme_scores = self._extract_key_themes(previous_response)
-        dominant_themes = [theme for theme, score in theme_scores.items() if score > 0.3]
+        dominant_themes = [theme for theme, score in theme_scores.items() if score > DOMINANT_THEME_SCORE]
         
-        # Extract specific topics mentioned
-        words = previous_response.lower().split()
-        key_topics = set(words) - set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with'])
-        key_topics = [t for t in key_topics if len(t) > 4]  # Filter short words
+        # Extract the most distinctive topics mentioned
+        key_topics = self.theme_engine.extract_topics(previous_response)
         
         # Analyze response quality
         analysis = self._analyze_response_quality(previous_response)
@@ -269,32 +350,38 @@ Format: Generate only the question."""
         
         return question, self.current_metric
 
+    def _format_response_analysis(self, analysis: Dict) -> str:
+        """Format the heuristic analysis block shared by evaluation prompts"""
+        return f"""- Length: {analysis['length']} words
+- Contains examples: {analysis['has_examples']}
+- Contains metrics: {analysis['has_metrics']}
+- Implementation details: {analysis['has_implementation']}
+- Discusses challenges: {analysis['has_challenges']}
+- Vague language count: {analysis['vague_words']}"""
+
+    def _evaluation_error(self) -> Dict:
+        """Default evaluation used when the model output cannot be used"""
+        return {
+            "score": 1.0,
+            "strengths": [],
+            "areas_for_improvement": ["Unable to evaluate response"],
+            "feedback": "Error processing response"
+        }
+
+    @profile_span("llm.evaluate_response")
     def evaluate_response(self, metric: str, response: str) -> Dict:
         """Evaluate response with specific criteria"""
         metric_details = self.metrics['aspects'][metric]
         analysis = self._analyze_response_quality(response)
         
-        system_prompt = """You are evaluating role-play responses.
-        Focus on demonstrated competencies and practical approaches.
-        Maintain confidentiality in feedback."""
-        
         prompt = f"""Evaluate this response for {metric_details['name']}:
 
 Response: "{response}"
 
 Response Analysis:
-- Length: {analysis['length']} words
-- Contains examples: {analysis['has_examples']}
-- Contains metrics: {analysis['has_metrics']}
-- Implementation details: {analysis['has_implementation']}
-- Discusses challenges: {analysis['has_challenges']}
-- Vague language count: {analysis['vague_words']}
+{self._format_response_analysis(analysis)}
 
-Scoring Guide:
-1.0 - Basic response lacking specifics
-2.0 - General understanding with some examples
-3.0 - Strong response with clear implementation
-4.0 - Exceptional detail and practical insight
+{SCORING_GUIDE}
 
 Format response as:
 {{
@@ -304,17 +391,110 @@ Format response as:
     "feedback": "brief constructive feedback"
 }}"""
         
-        try:
-            result = self._call_ollama(prompt, system_prompt)
-            return json.loads(result)
-        except:
-            return {
-                "score": 1.0,
-                "strengths": [],
-                "areas_for_improvement": ["Unable to evaluate response"],
-                "feedback": "Error processing response"
-            }
+        result = self._generate_json(prompt, EVALUATION_SYSTEM_PROMPT, EVALUATION_SCHEMA)
+        return result if result is not None else self._evaluation_error()
 
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token estimate (~4 characters per token) for context budgeting"""
+        return len(text) // 4 + 1
+
+    def _build_batch_prompt(self, metric: str, responses: List[str]) -> str:
+        """Build one evaluation prompt covering several answers for the same metric"""
+        metric_details = self.metrics['aspects'][metric]
+        sections = []
+        for answer_id, response in enumerate(responses, 1):
+            analysis = self._analyze_response_quality(response)
+            sections.append(f"""Answer {answer_id}: "{response}"
+Analysis:
+{self._format_response_analysis(analysis)}""")
+        answers = "\n\n".join(sections)
+        
+        return f"""Evaluate each of the following {len(responses)} answers for {metric_details['name']}.
+
+{SCORING_GUIDE}
+
+{answers}
+
+Return one result per answer, using the answer number as "id".
+Format response as:
+{{
+    "results": [
+        {{
+            "id": 1,
+            "score": X.X,
+            "strengths": ["specific strength 1", "specific strength 2"],
+            "areas_for_improvement": ["specific area 1", "specific area 2"],
+            "feedback": "brief constructive feedback"
+        }}
+    ]
+}}"""
+
+    def _plan_batches(self, metric: str, responses: List[str]) -> List[List[int]]:
+        """Group answer indices into batches that fit the model's context window"""
+        header_tokens = self._estimate_tokens(self._build_batch_prompt(metric, []))
+        header_tokens += self._estimate_tokens(EVALUATION_SYSTEM_PROMPT)
+        budget = self.context_window - header_tokens
+        
+        batches = []
+        current = []
+        used = 0
+        for index, response in enumerate(responses):
+            # Each answer costs its prompt text plus room for its JSON result
+            cost = self._estimate_tokens(response) + self.answer_prompt_tokens + self.result_tokens
+            if current and (used + cost > budget or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current = []
+                used = 0
+            current.append(index)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _parse_batch_results(self, parsed: Optional[Dict], count: int) -> List[Optional[Dict]]:
+        """Map a batched evaluation reply back to answers; None marks unusable entries"""
+        items = parsed.get("results") if parsed else None
+        mapped: List[Optional[Dict]] = [None] * count
+        if not isinstance(items, list):
+            return mapped
+        
+        # Keep any result whose score the schema can repair, e.g. "2" as well as 2.0
+        valid_score = is_coercible(as_score)
+        entries = [item for item in items if isinstance(item, dict) and valid_score(item.get("score"))]
+        has_ids = all(isinstance(item.get("id"), int) for item in entries)
+        if not has_ids and len(entries) != count:
+            # Without ids, results can only be matched positionally
+            return mapped
+        
+        for position, item in enumerate(entries):
+            index = item["id"] - 1 if has_ids else position
+            if 0 <= index < count and mapped[index] is None:
+                item = {key: value for key, value in item.items() if key != "id"}
+                mapped[index] = repair_object(item, EVALUATION_SCHEMA)
+        return mapped
+
+    @profile_span("llm.evaluate_responses")
+    def evaluate_responses(self, metric: str, responses: List[str]) -> List[Dict]:
+        """Evaluate several answers for the same metric with as few LLM calls as possible"""
+        results: List[Optional[Dict]] = [None] * len(responses)
+        
+        for batch in self._plan_batches(metric, responses):
+            batch_responses = [responses[i] for i in batch]
+            if len(batch) > 1:
+                prompt = self._build_batch_prompt(metric, batch_responses)
+                reply = self._generate_json(prompt, EVALUATION_SYSTEM_PROMPT, BATCH_EVALUATION_SCHEMA)
+                parsed = self._parse_batch_results(reply, len(batch))
+                for index, evaluation in zip(batch, parsed):
+                    results[index] = evaluation
+            
+            # Fall back to single calls for answers the batch reply did not cover
+            for index in batch:
+                if results[index] is None:
+                    results[index] = self.evaluate_response(metric, responses[index])
+        
+        return results
+
+    @profile_span("llm.generate_final_feedback")
     def generate_final_feedback(self, metric_scores: Dict[str, List[Dict]]) -> Dict:
         """Generate comprehensive final feedback"""
         system_prompt = """You are providing final assessment feedback.
@@ -351,16 +531,15 @@ Format response as:
     }}
 }}"""
         
-        try:
-            result = self._call_ollama(feedback_prompt, system_prompt)
-            return json.loads(result)
-        except:
-            return {
-                "metrics": {},
-                "overall_assessment": {
-                    "score": 1.0,
-                    "strengths": [],
-                    "development_areas": ["Unable to generate feedback"],
-                    "recommendations": ["System error - please review manually"]
-                }
+        result = self._generate_json(feedback_prompt, system_prompt, FINAL_FEEDBACK_SCHEMA)
+        if result is not None and result["overall_assessment"] is not None:
+            return result
+        return {
+            "metrics": {},
+            "overall_assessment": {
+                "score": 1.0,
+                "strengths": [],
+                "development_areas": ["Unable to generate feedback"],
+                "recommendations": ["System error - please review manually"]
             }
+        }
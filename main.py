@@ -1,16 +1,45 @@
 #!/usr/bin/env python3
+import argparse
+import codecs
 import json
+import os
+import select
+import shutil
+import sys
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 from llm_handler import LLMHandler
 from evaluator import ResponseEvaluator, ConversationTracker
+from live_analysis import LiveResponseAnalysis
+from profiling import SessionProfiler
+
+try:
+    import termios
+    import tty
+except ImportError:  # No character-level input outside POSIX terminals
+    termios = None
+
+ESCAPE_TIMEOUT = 0.05  # Seconds to wait for the rest of an escape sequence
+
+def skip_escape_sequence(fd: int, timeout: float = ESCAPE_TIMEOUT):
+    """Consume the rest of a terminal escape sequence after its ESC byte"""
+    # A bare Esc press has nothing following it
+    if not select.select([fd], [], [], timeout)[0]:
+        return
+    if os.read(fd, 1) not in (b"[", b"O"):
+        return
+    # CSI/SS3 sequences end at the first byte in 0x40-0x7E, e.g. "~" in ESC [ 3 ~
+    while True:
+        byte = os.read(fd, 1)
+        if not byte or 0x40 <= byte[0] <= 0x7E:
+            return
 
 def load_json(file_path: str) -> dict:
     with open(file_path, 'r') as f:
         return json.load(f)
 
 class AssessmentCLI:
-    def __init__(self):
+    def __init__(self, profiler: Optional[SessionProfiler] = None, live_guidance: bool = False):
         self.case_doc = load_json('case_doc.json')
         self.metrics = load_json('metrics.json')
         self.llm_handler = LLMHandler(self.case_doc, self.metrics)
@@ -19,6 +48,9 @@ class AssessmentCLI:
         self.responses = []
         self.current_metric = None
         self.questions_per_metric = 5  # Default value
+        self.profiler = profiler or SessionProfiler()
+        self.session_file = None
+        self.live_guidance = live_guidance
         
     def get_assessment_mode(self) -> int:
         """Get the assessment mode from user"""
@@ -38,6 +70,50 @@ class AssessmentCLI:
             except ValueError:
                 print("Invalid input. Please enter 1 or 2.")
         
+    def read_response(self) -> Tuple[str, LiveResponseAnalysis]:
+        """Read a response, with live guidance when enabled and running in a terminal"""
+        if not self.live_guidance or termios is None or not sys.stdin.isatty():
+            response = input("\nYour response: ").strip()
+            return response, LiveResponseAnalysis.from_text(response)
+        return self._read_live_response()
+        
+    def _read_live_response(self) -> Tuple[str, LiveResponseAnalysis]:
+        """Read a response character by character, updating guidance as it is typed"""
+        print("\nYour response (press Enter to submit):")
+        state = LiveResponseAnalysis()
+        fd = sys.stdin.fileno()
+        decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")(errors="replace")
+        saved_mode = termios.tcgetattr(fd)
+        try:
+            # cbreak mode delivers each keystroke while keeping Ctrl-C working
+            tty.setcbreak(fd)
+            self._render_live_line(state)
+            while True:
+                # Read the descriptor directly so select() sees exactly what is pending
+                data = os.read(fd, 1)
+                if data in (b"\r", b"\n", b""):
+                    break
+                if data == b"\x1b":
+                    skip_escape_sequence(fd)  # Ignore arrow, Delete, Home/End and bare Esc keys
+                    continue
+                char = decoder.decode(data)
+                if char in ("\x7f", "\b"):
+                    state.backspace()
+                elif char.isprintable():
+                    state.append(char)
+                self._render_live_line(state)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved_mode)
+            print()
+        return state.text.strip(), state
+        
+    def _render_live_line(self, state: LiveResponseAnalysis):
+        """Redraw the input line with the current guidance and the end of the response"""
+        hint = f"[{self.llm_handler.live_guidance(state)}] "
+        width = shutil.get_terminal_size().columns - len(hint) - 1
+        sys.stdout.write("\r\033[K" + hint + state.tail_text(width))
+        sys.stdout.flush()
+        
     def get_valid_response(self, question: str) -> Optional[str]:
         """Get and validate user response"""
         max_attempts = 3  # Maximum attempts for invalid responses
@@ -51,7 +127,7 @@ class AssessmentCLI:
             if attempts == 0:
                 print(f"\nAssessor: {question}")
                 
-            response = input("\nYour response: ").strip()
+            response, analysis = self.read_response()
             
             # Track candidate response
             self.conversation.add_interaction("candidate", response)
@@ -62,7 +138,7 @@ class AssessmentCLI:
                 return None
                 
             # Validate response
-            is_valid, feedback = self.llm_handler.validate_response(response)
+            is_valid, feedback = self.llm_handler.validate_analysis(analysis)
             if is_valid:
                 return response
                 
@@ -124,6 +200,21 @@ class AssessmentCLI:
             print(f"- {instruction}")
             
     def run_assessment(self):
+        """Run the assessment, capturing a profile when profiling is enabled"""
+        self.profiler.start()
+        try:
+            self._run_session()
+        finally:
+            self.profiler.stop()
+            # Fall back to a standalone name if the session ended before saving
+            report_base = self.session_file or f"assessment_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            report_files = self.profiler.write_reports(report_base)
+            if report_files:
+                print("\nProfiling reports saved to:")
+                for path in report_files:
+                    print(f"- {path}")
+            
+    def _run_session(self):
         """Run the main assessment loop"""
         self.display_welcome()
         print("\nYou have 25 minutes for this assessment.")
@@ -203,13 +294,25 @@ class AssessmentCLI:
         )
         
         # Save session data
-        session_file = f"assessment_session_{mode_name.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        self.conversation.save_session(results, session_file)
-        print(f"\nSession data saved to: {session_file}")
+        self.session_file = f"assessment_session_{mode_name.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        self.conversation.save_session(results, self.session_file)
+        print(f"\nSession data saved to: {self.session_file}")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prime Finance Role Play Assessment")
+    parser.add_argument('--profile', action='store_true',
+                        help="capture cProfile/tracemalloc reports next to the session file")
+    parser.add_argument('--profile-sample', type=float, default=None,
+                        help="fraction of sessions to profile (default: 1.0)")
+    parser.add_argument('--live-guidance', action='store_true',
+                        help="show response guidance while typing (POSIX terminals only)")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     try:
-        cli = AssessmentCLI()
+        profiler = SessionProfiler.from_env(args.profile, args.profile_sample)
+        cli = AssessmentCLI(profiler, args.live_guidance)
         cli.run_assessment()
     except KeyboardInterrupt:
         print("\nAssessment terminated by user.")
@@ -0,0 +1,134 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, List, Optional
+
+# Environment variables enabling profiling without CLI flags
+PROFILE_ENV = "ASSESSMENT_PROFILE"
+PROFILE_SAMPLE_ENV = "ASSESSMENT_PROFILE_SAMPLE"
+
+# Profiler capturing the current session, if any
+_active_profiler = None
+
+
+def profile_span(name: str) -> Callable:
+    """Mark a function as a named span in the session profile"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            profiler.enter_span(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit_span()
+        return wrapper
+    return decorator
+
+
+class SessionProfiler:
+    def __init__(self, enabled: bool = False, sample_rate: float = 1.0, top_n: int = 25):
+        # Only a sampled fraction of enabled sessions is actually captured
+        self.sample_rate = sample_rate
+        self.active = enabled and random.random() < sample_rate
+        self.top_n = top_n
+        self.profile = None
+        self.snapshot = None
+        self.span_stack = []
+        self.span_times = defaultdict(float)  # Collapsed stack -> self time in seconds
+
+    @classmethod
+    def from_env(cls, enabled: bool = False, sample_rate: Optional[float] = None) -> "SessionProfiler":
+        """Create a profiler from CLI options, falling back to environment variables"""
+        enabled = enabled or os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+        if sample_rate is None:
+            raw_rate = os.environ.get(PROFILE_SAMPLE_ENV, "1.0")
+            try:
+                sample_rate = float(raw_rate)
+            except ValueError:
+                # A bad setting must not abort the assessment itself
+                print(f"Warning: invalid {PROFILE_SAMPLE_ENV} '{raw_rate}', profiling every session")
+                sample_rate = 1.0
+        return cls(enabled, max(0.0, min(sample_rate, 1.0)))
+
+    def start(self):
+        """Start capturing the session"""
+        global _active_profiler
+        if not self.active:
+            return
+        _active_profiler = self
+        self.span_stack = [["session", time.perf_counter(), 0.0]]
+        tracemalloc.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self):
+        """Stop capturing and close any spans still open"""
+        global _active_profiler
+        if not self.active or self.profile is None:
+            return
+        self.profile.disable()
+        self.snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        while self.span_stack:
+            self.exit_span()
+        _active_profiler = None
+
+    def enter_span(self, name: str):
+        """Open a named span nested in the current one"""
+        self.span_stack.append([name, time.perf_counter(), 0.0])
+
+    def exit_span(self):
+        """Close the innermost span and record its self time"""
+        path = ";".join(span[0] for span in self.span_stack)
+        _, started, child_time = self.span_stack.pop()
+        elapsed = time.perf_counter() - started
+        self.span_times[path] += elapsed - child_time
+        if self.span_stack:
+            self.span_stack[-1][2] += elapsed
+
+    def collapsed_stacks(self) -> List[str]:
+        """Span self times in collapsed-stack format (microseconds) for flamegraph tools"""
+        return [
+            f"{path} {int(seconds * 1_000_000)}"
+            for path, seconds in sorted(self.span_times.items())
+        ]
+
+    def write_reports(self, session_file: str) -> List[str]:
+        """Write profiling reports next to the session file"""
+        if not self.active or self.profile is None:
+            return []
+
+        base = os.path.splitext(session_file)[0]
+        paths = {
+            "profile": f"{base}.prof",
+            "stats": f"{base}.profile.txt",
+            "collapsed": f"{base}.collapsed.txt",
+            "allocations": f"{base}.alloc.txt"
+        }
+
+        # Raw cProfile data for snakeviz/pstats, plus a readable summary
+        self.profile.dump_stats(paths["profile"])
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+        with open(paths["stats"], 'w') as f:
+            f.write(stream.getvalue())
+
+        with open(paths["collapsed"], 'w') as f:
+            f.write("\n".join(self.collapsed_stacks()) + "\n")
+
+        with open(paths["allocations"], 'w') as f:
+            f.write(f"Top {self.top_n} allocation sites\n")
+            for stat in self.snapshot.statistics("lineno")[:self.top_n]:
+                f.write(f"{stat}\n")
+
+        return list(paths.values())
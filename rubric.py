@@ -0,0 +1,80 @@
+from typing import Callable, Dict, List, Tuple
+
+# Bounds applied to every criterion score unless the rubric overrides them
+DEFAULT_MIN_SCORE = 0.3
+DEFAULT_MAX_SCORE = 1.0
+
+ResponseFeatures = Tuple[str, int]  # (lowercased response, word count)
+Check = Callable[[ResponseFeatures], bool]
+CriterionScorer = Callable[[ResponseFeatures], float]
+
+
+def _min_words(spec: Dict) -> Check:
+    threshold = spec['value']
+    return lambda features: features[1] >= threshold
+
+
+def _min_count(spec: Dict) -> Check:
+    token = spec['token']
+    threshold = spec['value']
+    return lambda features: features[0].count(token) >= threshold
+
+
+def _any_marker(spec: Dict) -> Check:
+    markers = tuple(spec['markers'])
+    return lambda features: any(marker in features[0] for marker in markers)
+
+
+def _no_marker(spec: Dict) -> Check:
+    markers = tuple(spec['markers'])
+    return lambda features: not any(marker in features[0] for marker in markers)
+
+
+# Check types understood in metrics.json rubric definitions
+CHECK_BUILDERS: Dict[str, Callable[[Dict], Check]] = {
+    "min_words": _min_words,
+    "min_count": _min_count,
+    "any_marker": _any_marker,
+    "no_marker": _no_marker
+}
+
+
+def _compile_criterion(name: str, spec: Dict) -> CriterionScorer:
+    """Compile one criterion definition into a single scoring closure"""
+    checks: List[Tuple[Check, float]] = []
+    for check in spec.get('checks', []):
+        builder = CHECK_BUILDERS.get(check.get('type'))
+        if builder is None:
+            raise ValueError(f"Unknown check type '{check.get('type')}' in criterion '{name}'")
+        checks.append((builder(check), float(check['points'])))
+
+    floor = float(spec.get('min_score', DEFAULT_MIN_SCORE))
+    ceiling = float(spec.get('max_score', DEFAULT_MAX_SCORE))
+    # Pre-scale by weight so scoring is a single call per criterion
+    scale = float(spec['weight'])
+    checks = tuple(checks)
+
+    def score(features: ResponseFeatures) -> float:
+        raw = sum(points for check, points in checks if check(features))
+        return max(floor, min(raw, ceiling)) * scale
+
+    return score
+
+
+def compile_rubric(metrics: Dict) -> Dict[str, Dict[str, CriterionScorer]]:
+    """Compile the rubric of every aspect in metrics.json into scoring closures"""
+    rubric = {}
+    for aspect_key, aspect in metrics['aspects'].items():
+        criteria = aspect.get('rubric')
+        if not criteria:
+            raise ValueError(f"Aspect '{aspect_key}' has no rubric defined in metrics")
+        rubric[aspect_key] = {
+            name: _compile_criterion(name, spec) for name, spec in criteria.items()
+        }
+    return rubric
+
+
+def extract_features(response: str) -> ResponseFeatures:
+    """Compute the response features shared by all criterion checks"""
+    text = response.lower()
+    return text, len(text.split())
@@ -0,0 +1,31 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules live at the repository root rather than in a package
+sys.path.insert(0, ROOT)
+
+
+def _load(filename):
+    with open(os.path.join(ROOT, filename)) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def metrics():
+    return _load('metrics.json')
+
+
+@pytest.fixture(scope="session")
+def case_doc():
+    return _load('case_doc_latest.json')
+
+
+@pytest.fixture
+def handler(case_doc, metrics):
+    from llm_handler import LLMHandler
+    return LLMHandler(case_doc, metrics)
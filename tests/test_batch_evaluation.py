@@ -0,0 +1,47 @@
+def test_plan_batches_caps_batch_size(handler):
+    responses = ["short answer"] * 7
+    assert handler._plan_batches('clear_communication', responses) == [[0, 1, 2, 3, 4], [5, 6]]
+
+
+def test_plan_batches_respects_context_window(handler):
+    handler.context_window = 1200
+    responses = ["word " * 400, "brief", "word " * 400]
+    batches = handler._plan_batches('clear_communication', responses)
+    assert [i for batch in batches for i in batch] == [0, 1, 2]
+    assert all(len(batch) < 3 for batch in batches)
+
+
+def test_parse_batch_results_maps_by_id(handler):
+    reply = {"results": [{"id": 2, "score": 3.0}, {"id": 1, "score": 2.0, "feedback": "ok"}]}
+    first, second = handler._parse_batch_results(reply, 2)
+    assert first["score"] == 2.0 and first["feedback"] == "ok"
+    assert second["score"] == 3.0
+    assert "id" not in first
+
+
+def test_parse_batch_results_maps_by_position_without_ids(handler):
+    reply = {"results": [{"score": 4.0}, {"score": 1.0}]}
+    assert [r["score"] for r in handler._parse_batch_results(reply, 2)] == [4.0, 1.0]
+
+
+def test_parse_batch_results_rejects_ambiguous_positions(handler):
+    reply = {"results": [{"score": 4.0}]}
+    assert handler._parse_batch_results(reply, 2) == [None, None]
+
+
+def test_evaluate_responses_falls_back_to_single_calls(handler, monkeypatch):
+    monkeypatch.setattr(handler, '_generate_json',
+                        lambda prompt, system, schema: {"results": [{"id": 1, "score": 3.0}]})
+    singles = []
+    monkeypatch.setattr(handler, 'evaluate_response',
+                        lambda metric, response: singles.append(response) or {"score": 2.0})
+    results = handler.evaluate_responses('clear_communication', ["first", "second"])
+    assert [r["score"] for r in results] == [3.0, 2.0]
+    assert singles == ["second"]
+
+
+def test_parse_batch_results_repairs_coercible_scores(handler):
+    reply = {"results": [{"id": 2, "score": 3.0}, {"id": 1, "score": "2"}]}
+    first, second = handler._parse_batch_results(reply, 2)
+    assert first["score"] == 2.0
+    assert second["score"] == 3.0
@@ -0,0 +1,54 @@
+from json_stream import (COMPLETE, MALFORMED, IncrementalJSONParser, as_object, as_score,
+                         as_text_list, decode_json_fragment, is_coercible, repair_object)
+
+SCHEMA = {
+    "score": (as_score, 1.0),
+    "strengths": (as_text_list, [])
+}
+
+
+def feed_in_chunks(parser, text, size=3):
+    for start in range(0, len(text), size):
+        if parser.feed(text[start:start + size]) != "incomplete":
+            break
+    return parser.state
+
+
+def test_parser_completes_and_ignores_trailing_text():
+    parser = IncrementalJSONParser()
+    state = feed_in_chunks(parser, '{"a": "}\\"{", "b": [1, {"c": 2}]} trailing chatter')
+    assert state == COMPLETE
+    assert parser.value == {"a": '}"{', "b": [1, {"c": 2}]}
+
+
+def test_parser_rejects_non_object_and_mismatched_brackets():
+    assert IncrementalJSONParser().feed('Sure! {"score": 3}') == MALFORMED
+    assert IncrementalJSONParser().feed('{"a": [1}') == MALFORMED
+
+
+def test_invalid_field_aborts_but_is_kept_for_repair():
+    validators = {field: is_coercible(coerce) for field, (coerce, _) in SCHEMA.items()}
+    parser = IncrementalJSONParser(validators)
+    state = feed_in_chunks(parser, '{"score": "N/A", "strengths": ["never reached"]}')
+    assert state == MALFORMED
+    assert parser.invalid_fields == {"score"}
+    assert repair_object(parser.partial, SCHEMA) == {"score": 1.0, "strengths": []}
+
+
+def test_repair_object_coerces_and_defaults():
+    repaired = repair_object({"score": "7", "strengths": "clear", "extra": 1}, SCHEMA)
+    assert repaired == {"score": 4.0, "strengths": ["clear"], "extra": 1}
+    nested = as_object(SCHEMA)({"score": 2})
+    assert nested == {"score": 2.0, "strengths": []}
+
+
+def test_close_recovers_members_of_unterminated_object():
+    parser = IncrementalJSONParser()
+    feed_in_chunks(parser, '{"a": 1, "b": {"c": [2, 3]')
+    assert parser.close() == {"a": 1, "b": {"c": [2, 3]}}
+
+
+def test_decode_json_fragment_returns_only_the_top_level_object():
+    assert decode_json_fragment('Sure! {"a": {"b": 1}} done') == {"a": {"b": 1}}
+    assert decode_json_fragment('Sure! {"a": {"b": 1}, "c": ') is None
+    assert decode_json_fragment('no json here') is None
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from main import skip_escape_sequence
+
+
+@pytest.fixture
+def pipe():
+    read_fd, write_fd = os.pipe()
+    yield read_fd, write_fd
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+def remaining(read_fd, write_fd):
+    os.write(write_fd, b"!")
+    return os.read(read_fd, 64)
+
+
+@pytest.mark.parametrize("sequence", [b"[A", b"[3~", b"[5~", b"[1;5C", b"OH"])
+def test_skips_whole_escape_sequence(pipe, sequence):
+    read_fd, write_fd = pipe
+    os.write(write_fd, sequence + b"ab")
+    skip_escape_sequence(read_fd)
+    assert remaining(read_fd, write_fd) == b"ab!"
+
+
+def test_bare_escape_does_not_consume_later_keys(pipe):
+    read_fd, write_fd = pipe
+    skip_escape_sequence(read_fd, timeout=0.01)
+    os.write(write_fd, b"ab")
+    assert remaining(read_fd, write_fd) == b"ab!"
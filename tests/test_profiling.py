@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+import profiling
+from profiling import PROFILE_ENV, PROFILE_SAMPLE_ENV, SessionProfiler, profile_span
+
+
+@profile_span("inner")
+def inner():
+    time.sleep(0.01)
+
+
+@profile_span("outer")
+def outer():
+    time.sleep(0.01)
+    inner()
+    inner()
+
+
+def test_nested_spans_record_collapsed_self_times():
+    profiler = SessionProfiler(enabled=True)
+    profiler.start()
+    try:
+        outer()
+    finally:
+        profiler.stop()
+
+    assert set(profiler.span_times) == {"session", "session;outer", "session;outer;inner"}
+    assert all(seconds >= 0 for seconds in profiler.span_times.values())
+    # The outer span's self time excludes the time spent in its children
+    inner_time = profiler.span_times["session;outer;inner"]
+    assert inner_time >= 0.02
+    assert 0.01 <= profiler.span_times["session;outer"] < 0.01 + inner_time
+    paths = [line.rsplit(" ", 1)[0] for line in profiler.collapsed_stacks()]
+    assert paths == ["session", "session;outer", "session;outer;inner"]
+    assert profiling._active_profiler is None
+
+
+def test_spans_are_pass_through_when_inactive():
+    profiler = SessionProfiler(enabled=False)
+    profiler.start()
+    outer()
+    profiler.stop()
+    assert not profiler.span_times
+
+
+@pytest.mark.parametrize("raw, expected", [("abc", 1.0), ("2.5", 1.0), ("-1", 0.0), ("0.25", 0.25)])
+def test_from_env_sanitises_sample_rate(monkeypatch, capsys, raw, expected):
+    monkeypatch.setenv(PROFILE_ENV, "1")
+    monkeypatch.setenv(PROFILE_SAMPLE_ENV, raw)
+    profiler = SessionProfiler.from_env()
+    assert profiler.sample_rate == expected
+    assert ("Warning" in capsys.readouterr().out) == (raw == "abc")
@@ -0,0 +1,64 @@
+import pytest
+
+from evaluator import ResponseEvaluator
+from rubric import DEFAULT_MIN_SCORE, compile_rubric, extract_features
+
+# Scored by hand against the original if/elif criteria: under 50 words, three
+# sentences, three commas, "because", "such as"/"for example" and one vague word
+ANSWER = ("First, maybe we meet the team. Then we agree on goals, such as targets, "
+          "for example weekly reviews. Finally, we follow up because it matters.")
+
+
+def single_criterion(weight, checks, **bounds):
+    return {"aspects": {"aspect": {"rubric": {"criterion": dict(weight=weight, checks=checks, **bounds)}}}}
+
+
+def test_carried_over_criteria_match_original_scores(metrics):
+    result = ResponseEvaluator(metrics).evaluate_response('clear_communication', ANSWER)
+    assert result["scores"] == pytest.approx({
+        "clarity": 0.9,
+        "structure": 2.0,
+        "completeness": 1.8,
+        "examples": 1.2
+    })
+    assert result["total"] == pytest.approx(5.9)
+
+
+def test_clarity_rewards_answers_without_vague_words(metrics):
+    evaluator = ResponseEvaluator(metrics)
+    vague = evaluator.evaluate_response('clear_communication', ANSWER)["scores"]["clarity"]
+    confident = evaluator.evaluate_response('clear_communication', ANSWER.replace("maybe ", ""))["scores"]["clarity"]
+    assert confident == pytest.approx(vague + 0.2 * 0.3 * 10)
+
+
+def test_every_aspect_scores_all_its_criteria(metrics):
+    evaluator = ResponseEvaluator(metrics)
+    for aspect, details in metrics['aspects'].items():
+        scores = evaluator.evaluate_response(aspect, ANSWER)["scores"]
+        assert set(scores) == set(details['rubric'])
+
+
+def test_unmatched_response_gets_floor_score(metrics):
+    result = ResponseEvaluator(metrics).evaluate_response('active_engagement', "ok")
+    assert result["total"] == pytest.approx(DEFAULT_MIN_SCORE * 10)
+
+
+def test_weight_scales_bounded_score():
+    marker = {"type": "any_marker", "markers": ["plan"], "points": 0.6}
+    scorer = compile_rubric(single_criterion(0.5, [marker]))["aspect"]["criterion"]
+    assert scorer(extract_features("A plan")) == pytest.approx(0.3)
+    assert scorer(extract_features("Nothing")) == pytest.approx(DEFAULT_MIN_SCORE * 0.5)
+
+    capped = compile_rubric(single_criterion(0.5, [marker, marker], min_score=0.0))["aspect"]["criterion"]
+    assert capped(extract_features("A plan")) == pytest.approx(0.5)
+    assert capped(extract_features("Nothing")) == 0.0
+
+
+def test_aspect_without_rubric_is_rejected():
+    with pytest.raises(ValueError, match="no rubric"):
+        compile_rubric({"aspects": {"aspect": {"name": "Aspect"}}})
+
+
+def test_unknown_check_type_is_rejected():
+    with pytest.raises(ValueError, match="Unknown check type 'regex'"):
+        compile_rubric(single_criterion(1.0, [{"type": "regex", "points": 1.0}]))
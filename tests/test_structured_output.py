@@ -0,0 +1,54 @@
+import pytest
+
+from llm_handler import EVALUATION_SCHEMA
+
+
+@pytest.fixture
+def stream_reply(handler, monkeypatch):
+    """Make the handler's next JSON-mode generation stream the given text, then stop"""
+    def install(text, chunk_size=4):
+        def fake_stream(prompt, system_prompt, parser):
+            chunks = []
+            for start in range(0, len(text), chunk_size):
+                chunks.append(text[start:start + chunk_size])
+                if parser.feed(chunks[-1]) != "incomplete":
+                    break
+            return "".join(chunks)
+        monkeypatch.setattr(handler, '_stream_ollama_json', fake_stream)
+    return install
+
+
+def test_invalid_nested_field_keeps_validated_members(handler, stream_reply):
+    stream_reply('{"score": 3.5, "areas_for_improvement": {"k": "v"}, "feedback": "never sent"}')
+    result = handler._generate_json("prompt", "system", EVALUATION_SCHEMA)
+    assert result == {"score": 3.5, "strengths": [], "areas_for_improvement": [], "feedback": ""}
+
+
+def test_truncated_evaluation_keeps_last_complete_member(handler, stream_reply):
+    stream_reply('{"score": 2.5, "strengths": ["clear steps", "specific')
+    result = handler.evaluate_response('clear_communication', "answer")
+    assert result["score"] == 2.5
+    assert result["strengths"] == ["clear steps"]
+
+
+def test_truncated_final_feedback_keeps_overall_assessment(handler, stream_reply):
+    stream_reply('{"metrics": {}, "overall_assessment": {"score": 3, "strengths": ["listens"]}')
+    result = handler.generate_final_feedback({})
+    assert result["overall_assessment"]["score"] == 3.0
+    assert result["overall_assessment"]["strengths"] == ["listens"]
+
+
+def test_truncated_batch_keeps_complete_results(handler, stream_reply, monkeypatch):
+    stream_reply('{"results": [{"id": 1, "score": 3}, {"id": 2, "score": 2}, {"id": 3, "sc')
+    singles = []
+    monkeypatch.setattr(handler, 'evaluate_response',
+                        lambda metric, response: singles.append(response) or {"score": 1.0})
+    results = handler.evaluate_responses('clear_communication', ["a", "b", "c"])
+    assert [r["score"] for r in results] == [3.0, 2.0, 1.0]
+    assert singles == ["c"]
+
+
+def test_reply_not_starting_with_object_is_abandoned(handler, stream_reply):
+    stream_reply('Sure! {"score": 4, "feedback": "good"}')
+    assert handler._generate_json("prompt", "system", EVALUATION_SCHEMA) is None
+    assert handler.evaluate_response('clear_communication', "answer")["feedback"] == "Error processing response"
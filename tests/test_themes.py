@@ -0,0 +1,41 @@
+import pytest
+
+from themes import DEFAULT_THEMES, DOMINANT_THEME_SCORE, ThemeEngine, stem
+
+
+@pytest.fixture(scope="module")
+def engine(case_doc):
+    return ThemeEngine(DEFAULT_THEMES, case_doc)
+
+
+def dominant(scores):
+    return {theme for theme, score in scores.items() if score > DOMINANT_THEME_SCORE}
+
+
+def test_keyword_does_not_match_inside_longer_word(engine):
+    assert engine.score_themes("Shareholders liked the results")["communication"] == 0.0
+    assert stem("shareholder") != stem("share")
+
+
+@pytest.mark.parametrize("derived, keyword", [
+    ("implementation", "implement"),
+    ("deployment", "deploy"),
+    ("measurement", "measure"),
+    ("communication", "communicate"),
+    ("discussion", "discuss"),
+    ("shared", "share"),
+])
+def test_derived_forms_share_keyword_stem(derived, keyword):
+    assert stem(derived) == stem(keyword)
+
+
+def test_derived_forms_count_towards_their_theme(engine):
+    scores = engine.score_themes("Our implementation and deployment plan")
+    assert dominant(scores) == {"implementation"}
+    assert dominant(engine.score_themes("We discussed the measurement")) == {"communication", "performance"}
+
+
+def test_context_only_match_is_never_dominant(engine):
+    scores = engine.score_themes("the quarterly results were good")
+    assert dominant(scores) == set()
+    assert dominant(engine.score_themes("branches " * 50)) == set()
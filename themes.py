@@ -0,0 +1,175 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+# Keyword lists defining each conversation theme
+DEFAULT_THEMES = {
+    "customer_service": ["customer", "service", "satisfaction", "experience", "feedback"],
+    "operations": ["process", "operation", "workflow", "efficiency", "system"],
+    "team_management": ["team", "staff", "employee", "manager", "training"],
+    "performance": ["performance", "metric", "kpi", "measure", "target"],
+    "communication": ["communicate", "message", "inform", "share", "discuss"],
+    "implementation": ["implement", "execute", "deploy", "roll out", "launch"],
+    "challenges": ["challenge", "issue", "problem", "difficulty", "concern"]
+}
+
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with",
+    "about", "after", "also", "because", "before", "being", "could", "should", "would",
+    "their", "there", "these", "those", "which", "while", "where", "other", "through",
+    "think", "really", "every", "using", "things", "something"
+}
+
+DERIVATIONAL_SUFFIXES = ("ation", "ment", "ion", "at")
+
+CASE_DOC_WEIGHT = 0.2  # Share of each theme centroid taken from related case_doc text
+DOMINANT_THEME_SCORE = 0.3  # Themes scoring above this are treated as dominant
+MIN_TOPIC_LENGTH = 5  # Shorter words are rarely meaningful follow-up topics
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def stem(token: str) -> str:
+    """Reduce a token to a crude stem so inflected and derived forms share one vocabulary entry"""
+    if token.endswith("sses"):
+        token = token[:-2]
+    elif token.endswith("ies") and len(token) > 4:
+        token = token[:-3] + "y"
+    elif token.endswith("s") and not token.endswith("ss") and len(token) > 3:
+        token = token[:-1]
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            break
+
+    # Strip derivational suffixes until none apply, so "implementation",
+    # "implemented" and "implement" (or "communication"/"communicate") meet
+    while True:
+        if token.endswith("e") and len(token) > 3:
+            token = token[:-1]
+        for suffix in DERIVATIONAL_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+                token = token[:-len(suffix)]
+                break
+        else:
+            return token
+
+
+def _iter_text(value) -> Iterator[str]:
+    """Yield every string leaf of a nested JSON document"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_text(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_text(item)
+
+
+class ThemeEngine:
+    def __init__(self, themes: Dict[str, List[str]], case_doc: Dict):
+        self.themes = list(themes)
+        self.vocabulary = {}  # Stemmed term (or bigram) -> column index
+        self.bigrams = set()
+        keyword_terms = {theme: [self._keyword_term(k) for k in keywords] for theme, keywords in themes.items()}
+
+        # Every string in the case document is treated as one corpus document
+        documents = [[stem(t) for t in tokenize(text)] for text in _iter_text(case_doc)]
+        documents = [doc for doc in documents if doc]
+        for terms in list(keyword_terms.values()) + documents:
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        # Corpus document frequencies give the IDF table used for topic extraction
+        document_frequency = Counter(term for doc in documents for term in set(doc))
+        corpus_size = len(documents)
+        self.idf = np.ones(len(self.vocabulary))
+        for term, index in self.vocabulary.items():
+            self.idf[index] = math.log((1 + corpus_size) / (1 + document_frequency[term])) + 1
+        self.default_idf = math.log(1 + corpus_size) + 1  # Terms never seen in the corpus
+
+        self.centroids = self._build_centroids(keyword_terms, documents)
+        self.keyword_columns = np.zeros(len(self.vocabulary), dtype=bool)
+        for terms in keyword_terms.values():
+            self.keyword_columns[[self.vocabulary[term] for term in terms]] = True
+
+    def _keyword_term(self, keyword: str) -> str:
+        terms = [stem(t) for t in tokenize(keyword)]
+        term = " ".join(terms)
+        if len(terms) > 1:
+            self.bigrams.add(term)
+        return term
+
+    def _build_centroids(self, keyword_terms: Dict[str, List[str]], documents: List[List[str]]) -> np.ndarray:
+        """Build the theme x vocabulary centroid matrix from keywords and case_doc text"""
+        keyword_matrix = np.zeros((len(self.themes), len(self.vocabulary)))
+        for row, theme in enumerate(self.themes):
+            for term in keyword_terms[theme]:
+                keyword_matrix[row, self.vocabulary[term]] = 1.0 / len(keyword_terms[theme])
+        if not documents:
+            return keyword_matrix
+
+        # Case documents contribute to the themes whose keywords they mention
+        doc_matrix = np.zeros((len(documents), len(self.vocabulary)))
+        for row, doc in enumerate(documents):
+            for term, count in Counter(doc).items():
+                doc_matrix[row, self.vocabulary[term]] = count
+        doc_matrix *= self.idf
+        norms = np.linalg.norm(doc_matrix, axis=1, keepdims=True)
+        doc_matrix /= np.where(norms > 0, norms, 1.0)
+
+        affinity = (keyword_matrix > 0).astype(float) @ (doc_matrix > 0).T.astype(float)
+        totals = affinity.sum(axis=1, keepdims=True)
+        context_matrix = (affinity / np.where(totals > 0, totals, 1.0)) @ doc_matrix
+        context_norms = np.abs(context_matrix).sum(axis=1, keepdims=True)
+        context_matrix /= np.where(context_norms > 0, context_norms, 1.0)
+        return keyword_matrix + CASE_DOC_WEIGHT * context_matrix
+
+    def _term_indices(self, tokens: List[str]) -> List[int]:
+        """Map response tokens (and known keyword bigrams) to vocabulary columns"""
+        terms = [stem(t) for t in tokens]
+        indices = [self.vocabulary[t] for t in terms if t in self.vocabulary]
+        if self.bigrams:
+            for first, second in zip(terms, terms[1:]):
+                bigram = f"{first} {second}"
+                if bigram in self.bigrams:
+                    indices.append(self.vocabulary[bigram])
+        return indices
+
+    def score_themes(self, response: str) -> Dict[str, float]:
+        """Score each theme for a response, normalised so the strongest theme is 1.0
+
+        Normalisation only applies when a theme keyword was used; case_doc context
+        alone keeps its small absolute score and never reaches DOMINANT_THEME_SCORE.
+        """
+        scores = np.zeros(len(self.themes))
+        indices = self._term_indices(tokenize(response))
+        if indices:
+            # Sparse dot product: only the columns present in the response are touched
+            columns, counts = np.unique(indices, return_counts=True)
+            scores = self.centroids[:, columns] @ counts
+            if self.keyword_columns[columns].any():
+                scores = scores / scores.max()
+            else:
+                scores = np.minimum(scores, DOMINANT_THEME_SCORE)
+        return {theme: float(score) for theme, score in zip(self.themes, scores)}
+
+    def extract_topics(self, response: str, limit: int = 5) -> List[str]:
+        """Return the response's most distinctive words ranked by TF-IDF against the case corpus"""
+        candidates = [t for t in tokenize(response) if len(t) >= MIN_TOPIC_LENGTH and t not in STOPWORDS]
+        term_frequency = Counter(candidates)
+        scored = []
+        for order, (token, count) in enumerate(term_frequency.items()):
+            index = self.vocabulary.get(stem(token))
+            idf = self.idf[index] if index is not None else self.default_idf
+            scored.append((-count * idf, order, token))
+        return [token for _, _, token in sorted(scored)[:limit]]